@@ -8,7 +8,7 @@ echo "=========================================================="
 if command -v python3 &> /dev/null; then
     echo "✅ Python 3 is installed"
 else
-    echo "❌ Python 3 is not installed. Please install Python 3.7+ first."
+    echo "❌ Python 3 is not installed. Please install Python 3.8+ first."
     exit 1
 fi
 
@@ -16,6 +16,12 @@ fi
 echo "📦 Installing Python dependencies..."
 pip3 install -r requirements.txt
 
+# Build the optional compiled Sudoku solver if Cython is available
+if python3 -c "import Cython" &> /dev/null; then
+    echo "⚙️  Building compiled Sudoku solver..."
+    cythonize -i -q sudoku_solver.pyx
+fi
+
 # Make Python script executable
 chmod +x csp_demo.py
 
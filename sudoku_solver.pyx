@@ -0,0 +1,122 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+# distutils: extra_compile_args = -O3 -march=native
+"""
+Compiled 9x9 Sudoku solver for csp_demo.SudokuCSP
+
+Same algorithm as the Python path: bitmask row/column/box sets, MRV cell
+selection and an iterative stack instead of recursion, but on C arrays.
+Build in place with:  cythonize -i sudoku_solver.pyx
+"""
+
+cdef extern int __builtin_popcount(unsigned int) noexcept nogil
+cdef extern int __builtin_ctz(unsigned int) noexcept nogil
+
+cdef unsigned int ALL_VALUES = 0x3FE  # bits 1..9
+
+
+cdef class SudokuSolver:
+    """Bitmask backtracking solver over a flat 81-cell board"""
+
+    cdef unsigned int row_used[9]
+    cdef unsigned int col_used[9]
+    cdef unsigned int box_used[9]
+    cdef int board[81]
+    cdef int empties[81]
+    cdef int n_empty
+    cdef bint givens_valid
+    cdef public long backtracks
+
+    def __init__(self, grid):
+        cdef int i, j, value
+        cdef unsigned int bit
+        self.n_empty = 0
+        self.backtracks = 0
+        self.givens_valid = True
+        for i in range(9):
+            self.row_used[i] = 0
+            self.col_used[i] = 0
+            self.box_used[i] = 0
+        for i in range(9):
+            for j in range(9):
+                value = grid[i][j]
+                self.board[i * 9 + j] = value
+                if value == 0:
+                    self.empties[self.n_empty] = i * 9 + j
+                    self.n_empty += 1
+                    continue
+                bit = 1u << value
+                if (self.row_used[i] | self.col_used[j] | self.box_used[(i // 3) * 3 + j // 3]) & bit:
+                    self.givens_valid = False
+                self.row_used[i] |= bit
+                self.col_used[j] |= bit
+                self.box_used[(i // 3) * 3 + j // 3] |= bit
+
+    cdef inline unsigned int candidates(self, int cell) noexcept nogil:
+        cdef int i = cell // 9, j = cell % 9
+        return ALL_VALUES & ~(self.row_used[i] | self.col_used[j] | self.box_used[(i // 3) * 3 + j // 3])
+
+    cdef inline void toggle(self, int cell, unsigned int bit) noexcept nogil:
+        cdef int i = cell // 9, j = cell % 9
+        self.row_used[i] ^= bit
+        self.col_used[j] ^= bit
+        self.box_used[(i // 3) * 3 + j // 3] ^= bit
+
+    cdef bint search(self) noexcept nogil:
+        cdef int stack_cell[81]
+        cdef unsigned int stack_cand[81]
+        cdef int depth = 0, k, cell, best, count, best_count
+        cdef unsigned int mask, bit
+        cdef bint descend = True
+
+        while True:
+            if descend:
+                if depth == self.n_empty:
+                    return True
+                # Minimum Remaining Values: the open cell with fewest candidates
+                best = -1
+                best_count = 10
+                for k in range(self.n_empty):
+                    cell = self.empties[k]
+                    if self.board[cell] != 0:
+                        continue
+                    count = __builtin_popcount(self.candidates(cell))
+                    if count < best_count:
+                        best = cell
+                        best_count = count
+                stack_cell[depth] = best
+                stack_cand[depth] = self.candidates(best)
+
+            cell = stack_cell[depth]
+            mask = stack_cand[depth]
+            if mask == 0:
+                # Values exhausted: drop this level and undo the parent's choice
+                depth -= 1
+                if depth < 0:
+                    return False
+                cell = stack_cell[depth]
+                self.toggle(cell, 1u << self.board[cell])
+                self.board[cell] = 0
+                self.backtracks += 1
+                descend = False
+                continue
+
+            bit = mask & (~mask + 1)
+            stack_cand[depth] = mask ^ bit
+            self.board[cell] = __builtin_ctz(bit)
+            self.toggle(cell, bit)
+            depth += 1
+            descend = True
+
+    cpdef bint solve(self):
+        """Fill the board in place; returns False if the puzzle has no solution"""
+        cdef bint solved
+        if not self.givens_valid:
+            return False
+        self.backtracks = 0
+        with nogil:
+            solved = self.search()
+        return solved
+
+    def grid(self):
+        """Current board as a list of 9 rows"""
+        return [[self.board[i * 9 + j] for j in range(9)] for i in range(9)]